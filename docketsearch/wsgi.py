@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'docketsearch.settings')
 
 application = get_wsgi_application()
+
+# Only processes that serve requests load this module, so warm up here rather
+# than when the app loads, which management commands and tests do too.
+from ujs_search.services.searchujs.warmup import warm_up  # noqa: E402
+
+warm_up(wait=False)
@@ -12,6 +12,9 @@ setup(
     install_requires=[
         "Click",
     ],
+    extras_require={
+        "columnar": ["pyarrow"],
+    },
     entry_points="""
         [console_scripts]
         ujs=ujs_search.bin.cli:ujs
@@ -0,0 +1,57 @@
+"""
+Testing the adaptive limit on concurrent requests to the portal.
+"""
+
+import asyncio
+from ujs_search.services.searchujs.concurrency import AdaptiveConcurrencyLimiter
+from ujs_search.services.searchujs.UJSSearch import SITE_ROOT, request_kind
+
+
+def test_window_grows_while_latency_is_flat():
+    limiter = AdaptiveConcurrencyLimiter(initial=2, maximum=4)
+
+    async def requests():
+        for _ in range(20):
+            await limiter.acquire()
+            limiter.release(0.1, 200)
+
+    asyncio.run(requests())
+    assert limiter.limit == 4
+
+
+def test_window_shrinks_on_errors():
+    limiter = AdaptiveConcurrencyLimiter(initial=8)
+
+    async def request():
+        await limiter.acquire()
+        limiter.release(0.1, 503)
+
+    asyncio.run(request())
+    assert limiter.limit == 4
+    assert limiter.snapshot()["in_flight"] == 0
+
+
+def test_mixed_request_kinds_do_not_shrink_window():
+    # fetching the search page is much faster than posting a search. A steady
+    # portal answering both should not look like one that is slowing down.
+    limiter = AdaptiveConcurrencyLimiter(initial=4)
+    search_page = request_kind("GET", f"{SITE_ROOT}/CaseSearch")
+    search = request_kind("POST", f"{SITE_ROOT}/CaseSearch")
+
+    async def requests():
+        for _ in range(20):
+            await limiter.acquire()
+            limiter.release(0.3, 200, kind=search_page)
+            await limiter.acquire()
+            limiter.release(2.5, 200, kind=search)
+
+    asyncio.run(requests())
+    assert limiter.limit >= 4
+
+
+def test_request_kind_leaves_out_host_and_query():
+    assert request_kind("GET", f"{SITE_ROOT}/CaseSearch") == "GET /CaseSearch"
+    assert (
+        request_kind("GET", f"{SITE_ROOT}/Report/CpDocketSheet?docketNumber=CP-1")
+        == "GET /Report/CpDocketSheet"
+    )
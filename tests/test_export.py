@@ -0,0 +1,73 @@
+"""
+Testing exporting search results.
+"""
+
+import csv
+from datetime import date
+import pytest
+from ujs_search.services.searchujs import SearchResult
+from ujs_search.services.searchujs.export import write_results
+
+
+def make_results(count):
+    for i in range(count):
+        yield SearchResult(
+            docket_number=f"CP-51-CR-000000{i}-2020",
+            court="CP",
+            docket_sheet_url="",
+            summary_url="",
+            caption="Comm. v. Rabbit, Bunny",
+            filing_date="01/02/2020",
+            case_status="Active",
+            otn="U1234",
+            dob="03/04/1950",
+            participants="Rabbit, Bunny",
+            county="Philadelphia",
+        )
+
+
+def test_export_csv(tmp_path):
+    path = str(tmp_path / "results.csv")
+    assert write_results(make_results(5), path, row_group_size=2) == 5
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 5
+    assert rows[0]["filing_date"] == "2020-01-02"
+    assert rows[0]["dob"] == "1950-03-04"
+
+
+def test_export_parquet(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "results.parquet")
+    assert write_results(make_results(5), path, row_group_size=2) == 5
+
+    assert pq.ParquetFile(path).metadata.num_row_groups == 3
+    table = pq.read_table(path)
+    assert table.num_rows == 5
+    assert table.schema.field("filing_date").type == pa.date32()
+    assert table.schema.field("dob").type == pa.date32()
+    for column in ("court", "county", "case_status"):
+        assert pa.types.is_dictionary(table.schema.field(column).type)
+    assert table.column("dob")[0].as_py() == date(1950, 3, 4)
+    assert table.column("county")[0].as_py() == "Philadelphia"
+
+
+def test_export_arrow_stream(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    path = str(tmp_path / "results.arrows")
+    assert write_results(make_results(5), path, row_group_size=2) == 5
+
+    with pa.OSFile(path) as source:
+        batches = list(pa.ipc.open_stream(source))
+    assert [batch.num_rows for batch in batches] == [2, 2, 1]
+    schema = batches[0].schema
+    assert schema.field("filing_date").type == pa.date32()
+    for column in ("court", "county", "case_status"):
+        assert pa.types.is_dictionary(schema.field(column).type)
+    assert batches[0].column("court")[0].as_py() == "CP"
+
+
+def test_arrow_file_extension_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        write_results(make_results(1), str(tmp_path / "results.arrow"))
@@ -0,0 +1,40 @@
+"""
+Testing the local index of names seen in search results.
+"""
+
+from datetime import date
+from ujs_search.services.searchujs.name_index import NameIndex, soundex
+
+
+def test_soundex():
+    assert soundex("robert") == "r163"
+    assert soundex("rupert") == "r163"
+    assert soundex("ashcraft") == "a261"
+
+
+def test_misspelled_name_search():
+    index = NameIndex()
+    index.add("Rabbit, Bunny", "CP-51-CR-0000001-2020", "01/01/1950")
+    index.add("Rabbitt, Bunnie Q.", "MJ-51101-CR-0000002-2020", "")
+    index.add("Smith, John", "CP-51-CR-0000003-2020", "02/02/1960")
+
+    matches = index.search("Bunny", "Rabit")
+    assert [m["docket_number"] for m in matches[:2]] == [
+        "CP-51-CR-0000001-2020",
+        "MJ-51101-CR-0000002-2020",
+    ]
+
+    matches = index.search("Bunny", "Rabbit", date(1960, 2, 2))
+    assert "CP-51-CR-0000001-2020" not in [m["docket_number"] for m in matches]
+
+
+def test_index_size_is_capped():
+    index = NameIndex(max_entries=2)
+    index.add("Rabbit, Bunny", "CP-51-CR-0000001-2020")
+    index.add("Hare, Harvey", "CP-51-CR-0000002-2020")
+    index.add("Rabbit, Bunny", "CP-51-CR-0000001-2020")
+    index.add("Smith, John", "CP-51-CR-0000003-2020")
+    assert len(index) == 2
+    assert index.search("Harvey", "Hare") == []
+    matches = index.search("Bunny", "Rabbit")
+    assert matches[0]["docket_number"] == "CP-51-CR-0000001-2020"
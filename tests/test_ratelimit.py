@@ -0,0 +1,85 @@
+"""
+Testing the rate limit shared between processes.
+"""
+
+import asyncio
+import os
+import stat
+import time
+import pytest
+from ujs_search.services.searchujs.ratelimit import (
+    SharedRateLimiter,
+    FileStore,
+    LocalStore,
+)
+
+
+def test_concurrency_budget_is_shared(tmp_path):
+    path = str(tmp_path / "limit.json")
+    # Two limiters, as if in two processes, drawing from the same file.
+    first = SharedRateLimiter(FileStore(path), rate=100, max_concurrent=2)
+    second = SharedRateLimiter(FileStore(path), rate=100, max_concurrent=2)
+
+    async def requests():
+        lease = await first.acquire()
+        await second.acquire()
+        third = asyncio.ensure_future(second.acquire())
+        await asyncio.sleep(0.01)
+        assert not third.done()
+        await first.release(lease)
+        await asyncio.wait_for(third, timeout=1)
+
+    asyncio.run(requests())
+
+
+def test_rate_is_limited():
+    limiter = SharedRateLimiter(LocalStore(), rate=1, burst=1)
+
+    async def requests():
+        await limiter.acquire()
+        second = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0.2)
+        # The one token was used by the first request, and a new one takes a
+        # second to refill.
+        assert not second.done()
+        await asyncio.wait_for(second, timeout=2)
+
+    asyncio.run(requests())
+
+
+class SlowStore(LocalStore):
+    """
+    A store that takes a while to update, like a busy file or cache.
+    """
+
+    def update(self, key, change):
+        time.sleep(0.1)
+        return super().update(key, change)
+
+
+def test_cancelled_acquire_gives_back_lease():
+    store = SlowStore()
+    limiter = SharedRateLimiter(store, rate=100, max_concurrent=1)
+
+    async def requests():
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0.02)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        # The lease taken after the cancel was given back, so another request
+        # doesn't have to wait for it to expire.
+        await asyncio.wait_for(limiter.acquire(), timeout=1)
+
+    asyncio.run(requests())
+    assert len(store.state[limiter.key]["leases"]) == 1
+
+
+def test_file_is_shared_with_group(tmp_path):
+    path = tmp_path / "limit.json"
+    old_umask = os.umask(0o022)
+    try:
+        asyncio.run(SharedRateLimiter(FileStore(str(path))).acquire())
+    finally:
+        os.umask(old_umask)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o660
@@ -3,11 +3,13 @@ Testing the functions that search for dockets.
 """
 
 import os
+from collections import Counter
 from datetime import date
 from ujs_search.services.searchujs import (
     search_by_dockets,
     SearchResult,
     search_by_name,
+    search_by_names,
 )
 
 
@@ -36,3 +38,85 @@ def test_search_by_name():
 def test_search_by_name_failure():
     results, errs = search_by_name("Googly", "Bear", date.today())
     assert len(results) == 0
+
+
+def test_search_by_names():
+    people = [
+        {"first_name": os.environ["TEST_FNAME"], "last_name": os.environ["TEST_LNAME"]},
+        {"first_name": "Googly", "last_name": "Bear", "dob": date.today()},
+    ]
+    results = search_by_names(people)
+    assert len(results) == 2
+    found = results[f"{os.environ['TEST_LNAME']}, {os.environ['TEST_FNAME']}"]
+    assert len(found["searchResults"]) == int(os.environ["TEST_NAME_RESULTCOUNT"])
+    not_found = results[f"Bear, Googly ({date.today().isoformat()})"]
+    assert len(not_found["searchResults"]) == 0
+
+
+SEARCH_PAGE = (
+    '<input name="__RequestVerificationToken" type="hidden" value="a-token" />'
+)
+
+
+def results_page(*rows):
+    """
+    A page of search results, with a row for each (docket number, name).
+    """
+    table = ""
+    for docket_number, name in rows:
+        cells = [""] * 19
+        cells[2] = docket_number
+        cells[4] = f"Comm. v. {name}"
+        cells[7] = name
+        cells[18] = '<a href="/docket">Docket</a><a href="/summary">Summary</a>'
+        table += "<tr>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>"
+    return (
+        '<html><body><table id="caseSearchResultGrid"><tbody>'
+        f"{table}</tbody></table></body></html>"
+    )
+
+
+class FakePortal:
+    """
+    Answers searches with a docket for each last name in `dockets`, and fails
+    searches for anyone else.
+    """
+
+    def __init__(self, dockets):
+        self.dockets = dockets
+        self.searches = Counter()
+
+    async def request(self, session, method, url, data=None, headers=None):
+        if method == "GET":
+            return 200, SEARCH_PAGE
+        last_name = data["ParticipantLastName"]
+        self.searches[last_name] += 1
+        if last_name not in self.dockets:
+            return 503, "Service Unavailable"
+        name = f"{last_name}, {data['ParticipantFirstName']}"
+        return 200, results_page((self.dockets[last_name], name))
+
+
+def test_search_by_names_offline():
+    portal = FakePortal({"Rabbit": "MJ-15101-CR-0000001-2020"})
+    people = [
+        {"first_name": "Bunny", "last_name": "Rabbit"},
+        {"first_name": "Bunny", "last_name": "Rabbit"},
+        {"first_name": "Googly", "last_name": "Bear", "dob": date(1950, 1, 1)},
+    ]
+    results = search_by_names(people, transport=portal)
+
+    # The person listed twice is only searched for once.
+    assert portal.searches == {"Rabbit": 1, "Bear": 1}
+    assert set(results) == {"Rabbit, Bunny", "Bear, Googly (1950-01-01)"}
+    found = results["Rabbit, Bunny"]
+    assert [r["docket_number"] for r in found["searchResults"]] == [
+        "MJ-15101-CR-0000001-2020"
+    ]
+    assert found["errors"] == []
+    # One person's failed search doesn't affect the others, and says why it failed.
+    failed = results["Bear, Googly (1950-01-01)"]
+    assert failed["searchResults"] == []
+    assert failed["errors"] == [
+        "POST https://ujsportal.pacourts.us/CaseSearch failed with status 503"
+    ]
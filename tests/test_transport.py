@@ -0,0 +1,32 @@
+"""
+Testing recording and replaying traffic to the UJS portal.
+"""
+
+import asyncio
+from ujs_search.services.searchujs.transport import (
+    RecordingTransport,
+    ReplayTransport,
+)
+
+
+class FakeTransport:
+    async def request(self, session, method, url, data=None, headers=None):
+        return 200, f"{method} {url}"
+
+
+def test_record_and_replay(tmp_path):
+    archive = str(tmp_path / "traffic.jsonl.gz")
+    data = {"SearchBy": "DocketNumber", "__RequestVerificationToken": "abc"}
+    with RecordingTransport(archive, inner=FakeTransport()) as recorder:
+        asyncio.run(recorder.request(None, "POST", "https://example", data=data))
+
+    replayer = ReplayTransport(archive)
+    data["__RequestVerificationToken"] = "a-different-token"
+    status, text = asyncio.run(
+        replayer.request(None, "POST", "https://example", data=data)
+    )
+    assert status == 200
+    assert text == "POST https://example"
+
+    status, text = asyncio.run(replayer.request(None, "GET", "https://elsewhere"))
+    assert status == 404
@@ -0,0 +1,101 @@
+"""
+Testing the variants of names to search for.
+"""
+
+from ujs_search.services.searchujs.variants import (
+    MAX_VARIANTS,
+    RULES,
+    generate_variants,
+    search_by_name_variants,
+)
+
+
+def test_generate_variants():
+    variants = generate_variants(
+        "Bunny Q.", "Rabbit-Hare", aliases=[{"last_name": "Burrow"}]
+    )
+    assert variants[0] == ("Bunny Q.", "Rabbit-Hare")
+    assert ("Bunny Q.", "Burrow") in variants
+    assert ("Bunny", "Rabbit-Hare") in variants
+    assert ("Bunny", "Rabbit") in variants
+    assert ("Bunny", "Hare") in variants
+
+
+def test_nickname_variants():
+    variants = generate_variants("Bob", "Rabbit", rules=["nicknames"])
+    assert ("Robert", "Rabbit") in variants
+    assert len(variants) == len(set(variants))
+
+
+def test_default_variants_are_limited():
+    # Nicknames are only swapped in when asked for.
+    variants = generate_variants("Bob Q.", "Rabbit-Hare")
+    assert len(variants) == 8
+    assert ("Robert", "Rabbit-Hare") not in variants
+    variants = generate_variants("Bob", "Rabbit-Hare", rules=RULES)
+    assert ("Robert", "Rabbit-Hare") in variants
+    assert len(variants) == MAX_VARIANTS
+
+
+def result_row(docket_number, name):
+    cells = [""] * 19
+    cells[2] = docket_number
+    cells[7] = name
+    cells[18] = '<a href="/docket">Docket</a><a href="/summary">Summary</a>'
+    return "<tr>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>"
+
+
+class FakePortal:
+    """
+    Answers searches for each last name in `rows` with a table of those rows,
+    and fails searches for any other name.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def request(self, session, method, url, data=None, headers=None):
+        if method == "GET":
+            return 200, (
+                '<input name="__RequestVerificationToken" type="hidden" '
+                'value="a-token" />'
+            )
+        rows = self.rows.get(data["ParticipantLastName"])
+        if rows is None:
+            return 503, ""
+        table = "".join(result_row(*row) for row in rows)
+        return 200, (
+            '<html><body><table id="caseSearchResultGrid"><tbody>'
+            f"{table}</tbody></table></body></html>"
+        )
+
+
+def test_search_by_name_variants_merges_results():
+    portal = FakePortal(
+        {
+            # One row for each participant of the same docket.
+            "Rabbit-Hare": [
+                ("CP-51-CR-0000001-2020", "Rabbit-Hare, Bunny"),
+                ("CP-51-CR-0000001-2020", "Rabbit-Hare, Bugs"),
+            ],
+            "Rabbit": [
+                ("CP-51-CR-0000001-2020", "Rabbit, Bunny"),
+                ("CP-51-CR-0000002-2020", "Rabbit, Bunny"),
+            ],
+            "Rabbit Hare": [("CP-51-CR-0000002-2020", "Rabbit Hare, Bunny")],
+        }
+    )
+    results, errs = search_by_name_variants(
+        "Bunny", "Rabbit-Hare", rules=["hyphenated"], transport=portal
+    )
+
+    matched = {r["docket_number"]: r["matched_variants"] for r in results}
+    assert matched == {
+        "CP-51-CR-0000001-2020": ["Rabbit-Hare, Bunny", "Rabbit, Bunny"],
+        "CP-51-CR-0000002-2020": ["Rabbit, Bunny", "Rabbit Hare, Bunny"],
+    }
+    # A failed variant doesn't stop the others, and its error says which it was.
+    assert errs == [
+        "Hare, Bunny: POST https://ujsportal.pacourts.us/CaseSearch failed with "
+        "status 503"
+    ]
@@ -0,0 +1,33 @@
+"""
+Testing the pieces that are loaded or fetched ahead of time when warming up.
+"""
+
+from ujs_search.services.searchujs.counties import (
+    counties_for_court_office,
+    county_for_docket,
+)
+from ujs_search.services.searchujs.tokens import TokenPool
+
+
+def test_counties_for_court_office():
+    assert counties_for_court_office("15101") == ["Chester"]
+    assert sorted(counties_for_court_office("26301")) == ["Columbia", "Montour"]
+    assert counties_for_court_office("99999") == []
+
+
+def test_county_for_docket():
+    assert county_for_docket("MJ-15101-CR-0000001-2020") == "Chester"
+    # Columbia and Montour share a district.
+    assert county_for_docket("MJ-26301-CR-0000001-2020") == ""
+    assert county_for_docket("CP-51-CR-0000001-2020") == ""
+
+
+def test_prefetched_tokens_expire():
+    pool = TokenPool(max_age=300)
+    pool.put("a-token", {})
+    assert pool.take() == ("a-token", {})
+    assert pool.take() is None
+
+    stale = TokenPool(max_age=0)
+    stale.put("a-token", {})
+    assert stale.take() is None
@@ -3,28 +3,74 @@ CLI Interface for searching the UJS portal.
 
 """
 
-
 import click
 import json
-from ujs_search.services.searchujs import search_by_name, search_by_dockets
+from ujs_search.services.searchujs import (
+    search_by_name,
+    search_by_dockets,
+    RecordingTransport,
+    ReplayTransport,
+    write_results,
+)
 
 
 @click.group()
-def ujs():
-    pass
+@click.option(
+    "--record", help="Record portal traffic to this archive file", default=None
+)
+@click.option(
+    "--replay", help="Replay portal traffic from this archive file", default=None
+)
+@click.option(
+    "--realtime",
+    is_flag=True,
+    help="When replaying, wait as long as the portal took to respond",
+)
+@click.pass_context
+def ujs(ctx, record, replay, realtime):
+    ctx.ensure_object(dict)
+    if record and replay:
+        raise click.UsageError("Use only one of --record and --replay")
+    if record:
+        ctx.obj["transport"] = ctx.with_resource(RecordingTransport(record))
+    elif replay:
+        ctx.obj["transport"] = ReplayTransport(replay, realtime=realtime)
+    else:
+        ctx.obj["transport"] = None
+
+
+def echo_or_export(results, output):
+    """
+    Print the (results, errors) of a search, or export the results to a file.
+    """
+    if output:
+        search_results, errs = results
+        count = write_results(search_results, output)
+        for err in errs:
+            click.echo(err, err=True)
+        click.echo(f"Exported {count} results to {output}")
+    else:
+        click.echo(json.dumps(results, indent=4))
+    click.echo("---Complete.---")
 
 
 @ujs.command()
 @click.option(
     "--docket-number", "-n", help="Docket number to search for", required=True
 )
-def docket(docket_number: str):
+@click.option(
+    "--output",
+    "-o",
+    help="Export results to this .parquet, .arrows or .csv file",
+    default=None,
+)
+@click.pass_context
+def docket(ctx, docket_number: str, output):
     """
     Search the UJS Portal for a specific docket.
     """
-    results = search_by_dockets([docket_number])
-    click.echo(json.dumps(results, indent=4))
-    click.echo("---Complete.---")
+    results = search_by_dockets([docket_number], transport=ctx.obj["transport"])
+    echo_or_export(results, output)
 
 
 @ujs.command()
@@ -33,7 +79,15 @@ def docket(docket_number: str):
 @click.option(
     "--date-of-birth", "-d", help="Birth date for search", required=False, default=None
 )
-def name(first_name, last_name, date_of_birth):
-    results = search_by_name(first_name, last_name, date_of_birth)
-    click.echo(json.dumps(results, indent=4))
-    click.echo("---Complete.---")
+@click.option(
+    "--output",
+    "-o",
+    help="Export results to this .parquet, .arrows or .csv file",
+    default=None,
+)
+@click.pass_context
+def name(ctx, first_name, last_name, date_of_birth, output):
+    results = search_by_name(
+        first_name, last_name, date_of_birth, transport=ctx.obj["transport"]
+    )
+    echo_or_export(results, output)
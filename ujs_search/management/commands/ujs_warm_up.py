@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from ujs_search.services.searchujs.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        "Connect to the UJS portal, prefetch verification tokens and load lookup "
+        "tables, to check that this host is ready to search the portal."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--connections",
+            type=int,
+            default=2,
+            help="How many connections to open to the portal",
+        )
+
+    def handle(self, *args, **options):
+        errs = warm_up(connections=options["connections"])
+        for err in errs:
+            self.stderr.write(err)
+        if not errs:
+            self.stdout.write(self.style.SUCCESS("Ready to search the UJS portal."))
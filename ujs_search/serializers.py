@@ -1,5 +1,6 @@
 import re
 from rest_framework import serializers as S
+from .services.searchujs.variants import DEFAULT_RULES, RULES
 
 
 court_pattern = re.compile(r"^(?:CP|MDJ|both)$", re.I)
@@ -17,6 +18,36 @@ class NameSearchSerializer(S.Serializer):
     )
 
 
+class AliasSerializer(S.Serializer):
+    """
+    Validate another name a person is known by, like a maiden name.
+    """
+
+    first_name = S.CharField(required=False, default="")
+    last_name = S.CharField(required=True)
+
+
+class NameVariantSearchSerializer(NameSearchSerializer):
+    """
+    Validate json asking to search for a name, optionally along with the
+    variants of the name.
+    """
+
+    expand_variants = S.BooleanField(required=False, default=False)
+    aliases = AliasSerializer(many=True, required=False, default=list)
+    rules = S.ListField(
+        child=S.ChoiceField(choices=RULES), required=False, default=list(DEFAULT_RULES)
+    )
+
+
+class MultipleNameSearchSerializer(S.Serializer):
+    """
+    Validate json asking to search for many people's names at once.
+    """
+
+    people = NameSearchSerializer(many=True)
+
+
 class DocketSearchSerializer(S.Serializer):
     """
     Validata json asking to search for a particular docket number.
@@ -7,7 +7,14 @@ from typing import List, Optional, Union, Tuple
 from datetime import date
 import logging
 import aiohttp
+from yarl import URL
 from .SearchResult import SearchResult
+from .transport import default_transport
+from .concurrency import portal_limiter
+from .ratelimit import get_shared_limiter
+from .tokens import prefetched_tokens
+from .counties import county_for_docket
+from . import name_index
 
 
 # requests.packages.urllib3.util.ssl_.DEFAULT_CIPHERS += "HIGH:!DH:!aNULL"
@@ -17,6 +24,15 @@ logger = logging.getLogger(__name__)
 SITE_ROOT = "https://ujsportal.pacourts.us"
 
 
+def request_kind(method: str, url: str) -> str:
+    """
+    The kind of a request, like "POST /CaseSearch", for comparing its latency to
+    similar requests. The query string is left out, so that there are only a few
+    kinds.
+    """
+    return f"{method} {URL(url).path}"
+
+
 def parse_row_column(row: "etree", position: int) -> str:
     """
     Get the value of a column in an html table row.
@@ -48,6 +64,8 @@ def parse_row(row: "etree") -> SearchResult:
     """
     Read a single row of a docket search result table.
 
+    If the row is missing a magisterial district docket's county, the county is
+    looked up from the docket's court office.
     """
     urls = parse_link_column(row)
 
@@ -64,6 +82,8 @@ def parse_row(row: "etree") -> SearchResult:
         docket_sheet_url=SITE_ROOT + urls[0],
         summary_url=SITE_ROOT + urls[1],
     )
+    if not res.county:
+        res.county = county_for_docket(res.docket_number)
     return res
 
 
@@ -84,16 +104,64 @@ class UJSSearch:
             return match.group("token")
         return ""
 
+    async def fetch_verification_token(self) -> Tuple[str, List[str]]:
+        """
+        Get a request verification token for a search.
+
+        Uses a token prefetched when the app warmed up, if there is one, and
+        otherwise requests the search page for a new token.
+        """
+        if self.transport is default_transport:
+            prefetched = prefetched_tokens.take()
+            if prefetched:
+                token, cookies = prefetched
+                self.sess.cookie_jar.update_cookies(cookies)
+                return token, []
+        main_page, errs = await self.fetch(f"{SITE_ROOT}/CaseSearch")
+        return self.get_request_verification_token(main_page), errs
+
+    async def request(self, method, url, data=None, headers=None):
+        """
+        Send a request through the transport, waiting for a slot in the
+        concurrency limiter and reporting back to it how the request went.
+
+        If there is a limit shared with other processes, also wait for the shared
+        budget to allow the request.
+        """
+        await self.limiter.acquire()
+        latency = None
+        status = None
+        lease = None
+        try:
+            if self.shared_limiter:
+                lease = await self.shared_limiter.acquire()
+            started = time.monotonic()
+            try:
+                status, text = await self.transport.request(
+                    self.sess, method, url, data=data, headers=headers
+                )
+            except Exception:
+                # A request that failed without a response still tells the
+                # limiter that the portal may be struggling.
+                latency = time.monotonic() - started
+                raise
+            latency = time.monotonic() - started
+            return status, text
+        finally:
+            if lease:
+                await self.shared_limiter.release(lease)
+            self.limiter.release(latency, status, kind=request_kind(method, url))
+
     async def fetch(self, url):
         """
         async method to fetch a url
         """
-        async with self.sess.get(url) as response:
-            if response.status == 200:
-                return (await response.text(), [])
-            else:
-                err = f"GET {url} failed with {response.status}"
-                return "", [err]
+        status, text = await self.request("GET", url)
+        if status == 200:
+            return (text, [])
+        else:
+            err = f"GET {url} failed with {status}"
+            return "", [err]
 
     async def post(self, url, data, additional_headers=None):
         """
@@ -105,23 +173,22 @@ class UJSSearch:
             # headers_to_send.pop("Upgrade-Insecure-Requests")
         else:
             headers_to_send = self.__headers__
-        async with self.sess.post(url, data=data, headers=headers_to_send) as response:
-            if response.status == 200:
-                return (await response.text(), [])
-            else:
-                # getting the text from the response seems to be neccessary to avoid a bug in openssl (or somewhere else)
-                # with ssl connections closing too soon.
-                #
-                # use response.request_info to see what was actually requested.
-                txt = await response.text()
-                err = f"POST {url} failed with status {response.status}"
-                return "", [err]
+        status, text = await self.request(
+            "POST", url, data=data, headers=headers_to_send
+        )
+        if status == 200:
+            return (text, [])
+        else:
+            err = f"POST {url} failed with status {status}"
+            return "", [err]
 
     def parse_results_from_page(
         self, page: str
     ) -> Tuple[List[SearchResult], List[str]]:
         """
         Extract a list of docket search results from the search results table.
+
+        The names in the results are added to the local name index.
         """
         page = lxml.html.document_fromstring(page.strip())
         results_table = page.xpath("//table[@id='caseSearchResultGrid']/tbody/tr")
@@ -132,6 +199,7 @@ class UJSSearch:
             for item in [parse_row(row) for row in results_table]
             if item is not None
         ]
+        name_index.default_index.add_results(search_results)
         return search_results, []
 
     __headers__ = {
@@ -147,13 +215,23 @@ class UJSSearch:
         "Host": "ujsportal.pacourts.us",
     }
 
-    def __init__(self, session):
+    def __init__(self, session, transport=None, limiter=None, shared_limiter=None):
         """
         Create the UJS Search helper.
 
         Args:
             session: a session object. Create with a context manager.
+            transport: optional transport for sending requests, such as a
+                RecordingTransport or ReplayTransport. Defaults to sending
+                requests through the session.
+            limiter: optional AdaptiveConcurrencyLimiter. Defaults to the limiter
+                shared by every search.
+            shared_limiter: optional SharedRateLimiter. Defaults to the limit
+                shared with other processes in UJS_SEARCH_SHARED_LIMIT, if any.
         """
         self.today = date.today().strftime(r"%m/%d/%Y")
         self.sess = session
+        self.transport = transport or default_transport
+        self.limiter = limiter or portal_limiter
+        self.shared_limiter = shared_limiter or get_shared_limiter()
         # self.sess = requests.Session()  # deprecated. need to switch to aio session.
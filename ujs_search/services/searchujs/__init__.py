@@ -1,3 +1,9 @@
-from .by_name import search_by_name
+from .by_name import search_by_name, search_by_names
 from .by_docket import search_by_dockets, search_by_docket
-from .SearchResult import SearchResult
\ No newline at end of file
+from .SearchResult import SearchResult
+from .transport import RecordingTransport, ReplayTransport
+from .name_index import find_likely_dockets
+from .concurrency import portal_limiter
+from .ratelimit import SharedRateLimiter, configure_shared_limiter
+from .export import write_results
+from .variants import search_by_name_variants
@@ -23,9 +23,15 @@ def make_docket_search_request(
     }
 
 
-async def search_by_docket_task(docket_number: str) -> Tuple[Dict, List]:
+async def search_by_docket_task(
+    docket_number: str,
+    transport=None,
+    connector: Optional[aiohttp.BaseConnector] = None,
+) -> Tuple[Dict, List]:
     """
     Task for searching ujs portal for a single docket number.
+
+    Pass a `connector` to share connections with other searches.
     """
     all_errs = []
     logger.debug("looking for docket " + docket_number)
@@ -33,19 +39,19 @@ async def search_by_docket_task(docket_number: str) -> Tuple[Dict, List]:
     # sslcontext = ssl.create_default_context()
     # sslcontext.set_ciphers("HIGH:!DH:!aNULL")
 
-    async with aiohttp.ClientSession(headers=UJSSearch.__headers__) as session:
-        searcher = UJSSearch(session=session)
-        # Request the landing page to get the form tokens
-        main_page, errs = await searcher.fetch(
-            "https://ujsportal.pacourts.us/CaseSearch"
-        )
+    async with aiohttp.ClientSession(
+        headers=UJSSearch.__headers__,
+        connector=connector,
+        connector_owner=connector is None,
+    ) as session:
+        searcher = UJSSearch(session=session, transport=transport)
+        # Get a form token, from the landing page or prefetched.
+        token, errs = await searcher.fetch_verification_token()
         all_errs.extend(errs)
 
         # Prepare the data for the search
         data = make_docket_search_request(
-            request_verification_token=searcher.get_request_verification_token(
-                main_page
-            ),
+            request_verification_token=token,
             docket_number=docket_number,
         )
 
@@ -64,6 +70,8 @@ async def search_by_docket_task(docket_number: str) -> Tuple[Dict, List]:
 
 async def search_by_dockets_task(
     docket_numbers: List[str],
+    transport=None,
+    connector: Optional[aiohttp.BaseConnector] = None,
 ) -> Tuple[List[SearchResult], List[str]]:
     """
     Async task for searching the ujs portal for a list of docket numbers.
@@ -72,7 +80,10 @@ async def search_by_dockets_task(
     # so this async task doing that many times returns with a list of these pairs.
     # We need to reslice these, to go from [(a,b), (a,b)] to ([a], [b])
     results_with_errs = await asyncio.gather(
-        *map(search_by_docket_task, docket_numbers)
+        *[
+            search_by_docket_task(dn, transport=transport, connector=connector)
+            for dn in docket_numbers
+        ]
     )
     results = []
     errs = []
@@ -82,13 +93,21 @@ async def search_by_dockets_task(
     return results, errs
 
 
-def search_by_dockets(docket_numbers: List[str]) -> Tuple[List[Dict], List[str]]:
+def search_by_dockets(
+    docket_numbers: List[str], transport=None
+) -> Tuple[List[Dict], List[str]]:
     """
     Search the CaseSearch UJS portal for docket numbers.
+
+    Pass a `transport` to record or replay the portal traffic.
     """
-    results, errs = asyncio.run(search_by_dockets_task(docket_numbers))
+    results, errs = asyncio.run(
+        search_by_dockets_task(docket_numbers, transport=transport)
+    )
     return [asdict(r) for r in results], errs
 
 
-def search_by_docket(docket_number: str) -> Tuple[List[Dict], List[str]]:
-    return search_by_dockets([docket_number])
\ No newline at end of file
+def search_by_docket(
+    docket_number: str, transport=None
+) -> Tuple[List[Dict], List[str]]:
+    return search_by_dockets([docket_number], transport=transport)
\ No newline at end of file
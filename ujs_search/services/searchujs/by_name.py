@@ -36,7 +36,11 @@ def make_name_search_request(
 
 
 async def search_by_name_task(
-    first_name: str, last_name: str, dob: Optional[date]
+    first_name: str,
+    last_name: str,
+    dob: Optional[date],
+    transport=None,
+    connector: Optional[aiohttp.BaseConnector] = None,
 ) -> Tuple[List[SearchResult], List[str]]:
     """
     Async task to earch the UJS CaseSearch site for a record relating to a person's name.
@@ -45,6 +49,8 @@ async def search_by_name_task(
         first_name (str): First name of person to search
         last_name (str): Last name
         dob (date): Birth date, optional
+        transport: optional transport for recording or replaying requests.
+        connector: optional connector to share connections with other searches.
 
     Returns:
         A list of search results
@@ -53,19 +59,21 @@ async def search_by_name_task(
     all_errs = []
     logger.debug("searching for dockets related to %s", first_name)
 
-    async with aiohttp.ClientSession(headers=UJSSearch.__headers__) as session:
-        searcher = UJSSearch(session=session)
-        # Request the landing page to get the form tokens
-        main_page, errs = await searcher.fetch(
-            "https://ujsportal.pacourts.us/CaseSearch"
-        )
+    # Each search gets its own session, so the cookies that go with its
+    # verification token are not mixed up with another search's.
+    async with aiohttp.ClientSession(
+        headers=UJSSearch.__headers__,
+        connector=connector,
+        connector_owner=connector is None,
+    ) as session:
+        searcher = UJSSearch(session=session, transport=transport)
+        # Get a form token, from the landing page or prefetched.
+        token, errs = await searcher.fetch_verification_token()
         all_errs.extend(errs)
 
         # Prepare the data for the search
         data = make_name_search_request(
-            request_verification_token=searcher.get_request_verification_token(
-                main_page
-            ),
+            request_verification_token=token,
             first_name=first_name,
             last_name=last_name,
             dob=dob,
@@ -76,6 +84,12 @@ async def search_by_name_task(
         )
         all_errs.extend(errs)
 
+    if not result_page:
+        # The search failed, and there is nothing to parse.
+        if not all_errs:
+            all_errs.append("The search returned an empty page")
+        return [], all_errs
+
     # parse results
     search_results, search_errs = searcher.parse_results_from_page(result_page)
     all_errs.extend(search_errs)
@@ -84,7 +98,7 @@ async def search_by_name_task(
 
 
 def search_by_name(
-    first_name: str, last_name: str, dob: Optional[date] = None
+    first_name: str, last_name: str, dob: Optional[date] = None, transport=None
 ) -> Tuple[Dict[str, str], List[str]]:
     """
     Search the UJS CaseSearch site for public records relating to a person's name.
@@ -93,9 +107,89 @@ def search_by_name(
         first_name (str): First name of person to search
         last_name (str): Last name
         dob (date): Birth date, optional
+        transport: optional transport for recording or replaying requests.
 
     Returns:
         the results as a list of dicts.
     """
-    results, errs = asyncio.run(search_by_name_task(first_name, last_name, dob))
+    results, errs = asyncio.run(
+        search_by_name_task(first_name, last_name, dob, transport=transport)
+    )
     return [asdict(res) for res in results], errs
+
+
+def person_key(first_name: str, last_name: str, dob: Optional[date] = None) -> str:
+    """
+    The key for a person's results in a search for many names.
+    """
+    key = f"{last_name}, {first_name}"
+    if dob:
+        key += f" ({dob.strftime(r'%Y-%m-%d')})"
+    return key
+
+
+async def search_by_names_task(
+    people: List[Dict],
+    transport=None,
+    connector: Optional[aiohttp.BaseConnector] = None,
+) -> Dict[str, Tuple[List[SearchResult], List[str]]]:
+    """
+    Async task to search the UJS CaseSearch site for many people at once, sharing
+    connections to the portal.
+
+    Args:
+        people: a list of dicts with first_name, last_name and optionally dob.
+        transport: optional transport for recording or replaying requests.
+        connector: optional connector to share. By default, the searches share
+            a new connector.
+
+    Returns:
+        a dict of each person's key to their search results and error messages.
+    """
+    # Search for each person only once, even if they are listed twice.
+    unique = {}
+    for person in people:
+        key = person_key(person["first_name"], person["last_name"], person.get("dob"))
+        unique[key] = person
+
+    shared_connector = connector or aiohttp.TCPConnector()
+
+    async def search_person(person: Dict) -> Tuple[List[SearchResult], List[str]]:
+        try:
+            return await search_by_name_task(
+                person["first_name"],
+                person["last_name"],
+                person.get("dob"),
+                transport=transport,
+                connector=shared_connector,
+            )
+        except Exception as ex:
+            logger.error("searching for %s failed: %s", person["last_name"], ex)
+            return [], [str(ex)]
+
+    try:
+        results = await asyncio.gather(*map(search_person, unique.values()))
+    finally:
+        if connector is None:
+            await shared_connector.close()
+    return dict(zip(unique.keys(), results))
+
+
+def search_by_names(people: List[Dict], transport=None) -> Dict[str, Dict]:
+    """
+    Search the UJS CaseSearch site for public records relating to many people's
+    names at once.
+
+    Args:
+        people: a list of dicts with first_name, last_name and optionally dob.
+        transport: optional transport for recording or replaying requests.
+
+    Returns:
+        a dict of each person's key, like "Rabbit, Bunny (1950-01-01)", to a dict
+        with their searchResults and errors.
+    """
+    results = asyncio.run(search_by_names_task(people, transport=transport))
+    return {
+        key: {"searchResults": [asdict(res) for res in found], "errors": errs}
+        for key, (found, errs) in results.items()
+    }
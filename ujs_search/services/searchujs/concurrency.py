@@ -0,0 +1,196 @@
+"""
+Adaptive control of how many requests we send to the UJS portal at once.
+
+The portal's capacity changes through the day, so rather than a fixed limit the
+limiter keeps a window of allowed concurrent requests that grows additively while
+latency stays flat, and shrinks multiplicatively (AIMD) when latency rises or the
+portal answers with 429 or 5xx errors.
+
+Different kinds of request take very different amounts of time (fetching the
+search page is much faster than posting a search), so latency is tracked
+separately for each kind.
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def is_overloaded(status: Optional[int]) -> bool:
+    """
+    Does a response status mean the portal is struggling? A status of None means
+    the request failed without a response.
+    """
+    return status is None or status == 429 or status >= 500
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limit the number of requests in flight to a window that adapts to the portal's
+    latency and errors.
+
+    The limiter can be shared by searches running in different event loops and
+    threads, such as the loops started by each call to `asyncio.run`.
+
+    Args:
+        initial: the starting window.
+        minimum: the window never shrinks below this.
+        maximum: the window never grows above this.
+        tolerance: latency more than this multiple of the baseline latency counts
+            as the portal slowing down.
+        backoff: the window is multiplied by this when the portal slows down.
+        smoothing: weight of each new latency in the moving average.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 32,
+        tolerance: float = 2.0,
+        backoff: float = 0.5,
+        smoothing: float = 0.2,
+    ):
+        self.window = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self.in_flight = 0
+        # smoothed and baseline latency, for each kind of request.
+        self.latency: Dict[str, float] = {}
+        self.baseline: Dict[str, float] = {}
+        self.last_decrease = 0.0
+        self.waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self.lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return max(self.minimum, int(self.window))
+
+    def snapshot(self) -> Dict:
+        """
+        The current state of the limiter, for metrics and logging.
+        """
+        with self.lock:
+            return {
+                "window": round(self.window, 2),
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "waiting": len(self.waiters),
+                "latency": dict(self.latency),
+                "baseline": dict(self.baseline),
+            }
+
+    async def acquire(self) -> None:
+        """
+        Wait for a free slot in the window.
+        """
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            if self.in_flight < self.limit and not self.waiters:
+                self.in_flight += 1
+                return
+            waiter = (loop, loop.create_future())
+            self.waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self.lock:
+                if waiter in self.waiters:
+                    self.waiters.remove(waiter)
+                    raise
+            # The slot was granted just as we were cancelled, so pass it on.
+            self.release()
+            raise
+
+    def release(
+        self,
+        latency: Optional[float] = None,
+        status: Optional[int] = None,
+        kind: str = "",
+    ) -> None:
+        """
+        Free a slot, and adjust the window based on how the request went.
+
+        Args:
+            latency: seconds the request took, or None if the request should not
+                affect the window (for example, if it was cancelled).
+            status: the response status, or None if there was no response.
+            kind: what kind of request it was, like "POST /CaseSearch". Latency is
+                only compared to the latency of requests of the same kind.
+        """
+        with self.lock:
+            self.in_flight -= 1
+            if latency is not None:
+                self.observe(latency, status, kind)
+            self.wake_waiters()
+
+    def observe(self, latency: float, status: Optional[int], kind: str = "") -> None:
+        """
+        Grow or shrink the window. Must be called holding the lock.
+        """
+        before = self.limit
+        if kind not in self.latency:
+            smoothed = latency
+        else:
+            smoothed = self.latency[kind] + self.smoothing * (
+                latency - self.latency[kind]
+            )
+        self.latency[kind] = smoothed
+        baseline = self.baseline.get(kind)
+        if baseline is None or smoothed < baseline:
+            baseline = smoothed
+        else:
+            # let the baseline drift up slowly, in case the portal just got slower.
+            baseline += 0.01 * (smoothed - baseline)
+        self.baseline[kind] = baseline
+
+        slowing = smoothed > baseline * self.tolerance
+        if is_overloaded(status) or slowing:
+            # Only back off once per round trip, so that a burst of slow responses
+            # to requests sent at the same time shrinks the window only once.
+            now = time.monotonic()
+            if now - self.last_decrease > smoothed:
+                self.window = max(self.minimum, self.window * self.backoff)
+                self.last_decrease = now
+        else:
+            self.window = min(self.maximum, self.window + 1 / self.window)
+
+        if self.limit != before:
+            logger.debug(
+                "portal concurrency window %s -> %s (%s latency %.2fs, baseline %.2fs)",
+                before,
+                self.limit,
+                kind,
+                smoothed,
+                baseline,
+            )
+
+    def wake_waiters(self) -> None:
+        """
+        Hand free slots to waiting requests. Must be called holding the lock.
+        """
+        while self.waiters and self.in_flight < self.limit:
+            loop, future = self.waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(grant, future)
+            except RuntimeError:
+                # That request's event loop has closed.
+                continue
+            self.in_flight += 1
+
+
+def grant(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+portal_limiter = AdaptiveConcurrencyLimiter()
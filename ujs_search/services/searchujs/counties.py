@@ -0,0 +1,52 @@
+"""
+Look up the county of a magisterial district court from its court office code.
+"""
+
+import csv
+import os
+import re
+from functools import lru_cache
+from typing import List, Pattern, Tuple
+
+LOOKUP_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "reference", "county_lookup.csv"
+)
+
+
+@lru_cache(maxsize=None)
+def load_county_lookup() -> Tuple[Tuple[Pattern, str, str], ...]:
+    """
+    Load the table of court office code patterns, county codes and counties.
+
+    The table is read from disk once, and kept in memory after that.
+    """
+    with open(LOOKUP_PATH, newline="") as f:
+        return tuple(
+            (re.compile(row["regex"]), row["county_code"], row["County"])
+            for row in csv.DictReader(f)
+        )
+
+
+def counties_for_court_office(court_office: str) -> List[str]:
+    """
+    Find the counties served by a court office, like '51101' in the docket
+    number MJ-51101-CR-0000001-2020. Some districts serve more than one county.
+    """
+    return [
+        county
+        for pattern, _, county in load_county_lookup()
+        if pattern.fullmatch(court_office)
+    ]
+
+
+def county_for_docket(docket_number: str) -> str:
+    """
+    Find the county of a magisterial district docket, like MJ-51101-CR-0000001-2020,
+    from its court office. Returns "" for other dockets, or if the court office
+    serves more than one county.
+    """
+    match = re.match(r"^MJ-(\d{5})-", docket_number.strip(), re.I)
+    if not match:
+        return ""
+    counties = counties_for_court_office(match.group(1))
+    return counties[0] if len(counties) == 1 else ""
@@ -0,0 +1,176 @@
+"""
+Export search results in a columnar format, for analytics.
+
+Results are written in row groups, so exporting a very large number of results
+only keeps one row group in memory at a time. Parquet and Arrow need pyarrow
+(`pip install django-docketsearch[columnar]`). Without it, results can still be
+exported as csv.
+"""
+
+from __future__ import annotations
+import csv
+import logging
+import os
+from dataclasses import asdict, fields, is_dataclass
+from datetime import date, datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from .SearchResult import SearchResult
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = [f.name for f in fields(SearchResult)]
+DATE_COLUMNS = ("filing_date", "dob")
+# Columns with only a few distinct values, which are stored once per row group.
+DICTIONARY_COLUMNS = ("court", "county", "case_status")
+
+FORMATS_BY_EXTENSION = {
+    ".parquet": "parquet",
+    ".arrows": "arrow",
+    ".csv": "csv",
+}
+
+
+def parse_date(value: Optional[str]) -> Optional[date]:
+    """
+    Read a mm/dd/yyyy date, the way the portal shows dates.
+    """
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value.strip(), r"%m/%d/%Y").date()
+    except ValueError:
+        return None
+
+
+def row_groups(
+    results: Iterable[Union[SearchResult, Dict]], size: int
+) -> Iterator[List[Dict]]:
+    """
+    Split results into lists of at most `size` dicts.
+    """
+    rows = (asdict(r) if is_dataclass(r) else r for r in results)
+    while True:
+        group = list(islice(rows, size))
+        if not group:
+            return
+        yield group
+
+
+def arrow_type(column: str) -> "pa.DataType":
+    if column in DATE_COLUMNS:
+        return pa.date32()
+    if column in DICTIONARY_COLUMNS:
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.string()
+
+
+def arrow_schema() -> "pa.Schema":
+    return pa.schema([(column, arrow_type(column)) for column in COLUMNS])
+
+
+def arrow_batch(group: List[Dict], schema: "pa.Schema") -> "pa.RecordBatch":
+    arrays = []
+    for column in COLUMNS:
+        values = [row.get(column) for row in group]
+        if column in DATE_COLUMNS:
+            arrays.append(pa.array([parse_date(v) for v in values], pa.date32()))
+        elif column in DICTIONARY_COLUMNS:
+            arrays.append(pa.array(values, pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, pa.string()))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def write_parquet(groups: Iterator[List[Dict]], path: str) -> int:
+    schema = arrow_schema()
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for group in groups:
+            writer.write_table(pa.Table.from_batches([arrow_batch(group, schema)]))
+            count += len(group)
+    return count
+
+
+def write_arrow(groups: Iterator[List[Dict]], path: str) -> int:
+    # The streaming format allows each row group its own dictionaries.
+    schema = arrow_schema()
+    count = 0
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_stream(sink, schema) as writer:
+        for group in groups:
+            writer.write_batch(arrow_batch(group, schema))
+            count += len(group)
+    return count
+
+
+def write_csv(groups: Iterator[List[Dict]], path: str) -> int:
+    count = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for group in groups:
+            for row in group:
+                values = []
+                for column in COLUMNS:
+                    value = row.get(column)
+                    if column in DATE_COLUMNS:
+                        value = parse_date(value)
+                        value = value.isoformat() if value else ""
+                    values.append(value)
+                writer.writerow(values)
+            count += len(group)
+    return count
+
+
+WRITERS = {"parquet": write_parquet, "arrow": write_arrow, "csv": write_csv}
+
+
+def write_results(
+    results: Iterable[Union[SearchResult, Dict]],
+    path: str,
+    format: Optional[str] = None,
+    row_group_size: int = 50000,
+) -> int:
+    """
+    Write search results to a file, one row group at a time.
+
+    Dates are written as dates, and the court, county and case status columns
+    are dictionary encoded in parquet and arrow.
+
+    Args:
+        results: SearchResults, or dicts like the search functions return. Can be
+            a generator, so that not all results need to be in memory at once.
+        path: the file to write. Use .arrows rather than .arrow for the arrow
+            streaming format, since .arrow means the arrow file format.
+        format: 'parquet', 'arrow' (the arrow streaming format) or 'csv'. By
+            default, guessed from the path's extension, or parquet if pyarrow is
+            installed and csv otherwise.
+        row_group_size: how many rows to write at a time.
+
+    Returns:
+        the number of results written.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".arrow":
+        # .arrow means the arrow file format, which cannot hold a different
+        # dictionary for each row group, as written by the streaming format.
+        raise ValueError(
+            "Cannot export to a .arrow file. Use .arrows (the arrow streaming "
+            "format) or .parquet instead."
+        )
+    if format is None:
+        format = FORMATS_BY_EXTENSION.get(extension, "parquet" if pa else "csv")
+    if format not in WRITERS:
+        raise ValueError(f"Cannot export search results as {format}")
+    if format != "csv" and pa is None:
+        raise ImportError(f"Exporting as {format} needs pyarrow. Try csv instead.")
+    count = WRITERS[format](row_groups(results, row_group_size), path)
+    logger.debug("exported %d search results to %s", count, path)
+    return count
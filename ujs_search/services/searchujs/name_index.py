@@ -0,0 +1,310 @@
+"""
+A local index of the names of people we have seen in UJS search results.
+
+Names go into the index as they are parsed out of search results. The index
+can then suggest which dockets probably belong to a person, even if their name
+is misspelled, so that the portal only needs to be asked to confirm likely
+candidates.
+"""
+
+from __future__ import annotations
+import json
+import re
+import threading
+import unicodedata
+from collections import Counter, OrderedDict, defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from django.conf import settings
+from .SearchResult import SearchResult
+
+
+# Captions look like "Comm. v. Rabbit, Bunny". Everything up to the "v." is dropped.
+caption_pattern = re.compile(r"^.*?\bvs?\.\s+", re.I)
+
+soundex_codes = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def normalize_tokens(name: str) -> List[str]:
+    """
+    Split a name into lowercase tokens, with accents and punctuation removed.
+    """
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(c for c in name if not unicodedata.combining(c)).lower()
+    return re.findall(r"[a-z0-9]+", name.replace("'", ""))
+
+
+def soundex(token: str) -> str:
+    """
+    The Soundex code of a token, like 'r163' for 'Robert'.
+    """
+    if not token:
+        return ""
+    code = token[0]
+    last = soundex_codes.get(token[0], "")
+    for char in token[1:]:
+        digit = soundex_codes.get(char, "")
+        if digit and digit != last:
+            code += digit
+        if char not in "hw":
+            last = digit
+    return (code + "000")[:4]
+
+
+def trigrams(token: str) -> Set[str]:
+    """
+    The set of three-letter sequences in a token, padded so that the start
+    and end of the token count too.
+    """
+    padded = f"  {token} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(left: Set[str], right: Set[str]) -> float:
+    """
+    Jaccard similarity of two sets of trigrams.
+    """
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+def split_name(name: str) -> Tuple[List[str], List[str]]:
+    """
+    Split a "Last, First Middle" name into its last name and first name tokens.
+    """
+    if "," in name:
+        last, first = name.split(",", 1)
+        return normalize_tokens(last), normalize_tokens(first)
+    tokens = normalize_tokens(name)
+    return tokens[-1:], tokens[:-1]
+
+
+def normalize_dob(dob) -> str:
+    """
+    Dates of birth are kept as mm/dd/yyyy strings, the way the portal shows them.
+    """
+    if isinstance(dob, date):
+        return dob.strftime(r"%m/%d/%Y")
+    return (dob or "").strip()
+
+
+class NameIndex:
+    """
+    In-memory index of people's names, with the dockets they appeared on.
+
+    Names are looked up by the trigrams and soundex codes of their last names, and
+    then scored against the query by how similar the first and last names are.
+
+    Args:
+        max_entries: the most names to keep. Once the index is full, the names
+            that were least recently added are dropped. If 0, nothing is kept.
+    """
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        # Each entry is (last name tokens, first name tokens, dob, docket number),
+        # kept by id in the order they were added.
+        self.entries: "OrderedDict[int, Tuple]" = OrderedDict()
+        self.ids: Dict[Tuple, int] = {}
+        self.postings: Dict[str, Set[int]] = defaultdict(set)
+        self.next_id = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, name: str, docket_number: str, dob: str = "") -> None:
+        """
+        Add a single name, and the docket it appeared on, to the index.
+        """
+        if not self.max_entries:
+            return
+        last, first = split_name(name)
+        if not last:
+            return
+        entry = (tuple(last), tuple(first), normalize_dob(dob), docket_number)
+        with self.lock:
+            if entry in self.ids:
+                # Seen again, so it is the last to be dropped.
+                self.entries.move_to_end(self.ids[entry])
+                return
+            entry_id = self.next_id
+            self.next_id += 1
+            self.ids[entry] = entry_id
+            self.entries[entry_id] = entry
+            for key in self.keys(last):
+                self.postings[key].add(entry_id)
+            while len(self.entries) > self.max_entries:
+                self.drop_oldest()
+
+    def drop_oldest(self) -> None:
+        """
+        Remove the least recently added entry. Must be called holding the lock.
+        """
+        entry_id, entry = self.entries.popitem(last=False)
+        del self.ids[entry]
+        for key in self.keys(entry[0]):
+            postings = self.postings[key]
+            postings.discard(entry_id)
+            if not postings:
+                del self.postings[key]
+
+    def add_results(self, results: Iterable[SearchResult]) -> None:
+        """
+        Add the participants and captions of search results to the index.
+        """
+        for result in results:
+            if result.participants:
+                self.add(result.participants, result.docket_number, result.dob)
+            if result.caption:
+                caption = caption_pattern.sub("", result.caption)
+                self.add(caption, result.docket_number, result.dob)
+
+    @staticmethod
+    def keys(last: List[str]) -> Set[str]:
+        keys = set()
+        for token in last:
+            keys.add("S:" + soundex(token))
+            keys.update("T:" + gram for gram in trigrams(token))
+        return keys
+
+    def search(
+        self,
+        first_name: str,
+        last_name: str,
+        dob: Optional[date] = None,
+        limit: int = 20,
+        min_score: float = 0.5,
+    ) -> List[Dict]:
+        """
+        Find the dockets most likely to belong to a person.
+
+        A candidate whose date of birth is known and differs from `dob` is never
+        returned.
+
+        Returns:
+            a list of dicts with the docket_number, the name that matched, the
+            dob and a score between 0 and 1, best matches first.
+        """
+        last = normalize_tokens(last_name)
+        first = normalize_tokens(first_name)
+        wanted_dob = normalize_dob(dob)
+        # Only score names that sound like the queried last name or share at
+        # least a third of its trigrams.
+        keys = self.keys(last)
+        needed = max(1, (len(keys) - len(last)) // 3)
+        with self.lock:
+            hits: Counter[int] = Counter()
+            for key in keys:
+                postings = self.postings.get(key, ())
+                hits.update(dict.fromkeys(postings, needed if key[0] == "S" else 1))
+            candidates = [self.entries[p] for p, n in hits.items() if n >= needed]
+
+        best: Dict[str, Dict] = {}
+        for entry_last, entry_first, entry_dob, docket_number in candidates:
+            if wanted_dob and entry_dob and wanted_dob != entry_dob:
+                continue
+            score = 0.6 * self.score_tokens(last, entry_last) + 0.4 * (
+                self.score_tokens(first, entry_first)
+            )
+            if wanted_dob and wanted_dob == entry_dob:
+                score = min(1.0, score + 0.1)
+            if score < min_score:
+                continue
+            if docket_number not in best or best[docket_number]["score"] < score:
+                best[docket_number] = {
+                    "docket_number": docket_number,
+                    "name": " ".join(entry_first + entry_last),
+                    "dob": entry_dob,
+                    "score": round(score, 3),
+                }
+        return sorted(best.values(), key=lambda match: -match["score"])[:limit]
+
+    @staticmethod
+    def score_tokens(query: List[str], candidate: Tuple[str, ...]) -> float:
+        """
+        Score how well the tokens of a queried name match a candidate name.
+
+        Each query token is matched to its most similar candidate token. A matching
+        soundex code counts as a close match, and a lone initial matches any name
+        starting with that letter.
+        """
+        if not query:
+            return 1.0
+        if not candidate:
+            return 0.0
+        total = 0.0
+        for token in query:
+            token_score = 0.0
+            for other in candidate:
+                if token == other:
+                    token_score = 1.0
+                    break
+                score = similarity(trigrams(token), trigrams(other))
+                if soundex(token) == soundex(other):
+                    score = max(score, 0.8)
+                if (len(token) == 1 or len(other) == 1) and token[0] == other[0]:
+                    score = max(score, 0.7)
+                token_score = max(token_score, score)
+            total += token_score
+        return total / len(query)
+
+    def save(self, path: str) -> None:
+        """
+        Save the index to a json file.
+        """
+        with self.lock:
+            entries = [list(entry) for entry in self.entries.values()]
+        with open(path, "w") as f:
+            json.dump(entries, f)
+
+    def load(self, path: str) -> None:
+        """
+        Add the entries of an index saved with `save` to this index.
+        """
+        with open(path) as f:
+            entries = json.load(f)
+        for last, first, dob, docket_number in entries:
+            self.add(", ".join([" ".join(last), " ".join(first)]), docket_number, dob)
+
+
+def configured_size() -> int:
+    """
+    How many names the default index keeps, from UJS_SEARCH_NAME_INDEX_SIZE.
+    """
+    if settings.configured:
+        return getattr(settings, "UJS_SEARCH_NAME_INDEX_SIZE", 100000)
+    return 100000
+
+
+default_index = NameIndex(max_entries=configured_size())
+
+
+def find_likely_dockets(
+    first_name: str, last_name: str, dob: Optional[date] = None, limit: int = 20
+) -> List[Dict]:
+    """
+    Search the local index of names we have already seen for dockets that likely
+    belong to a person. This does not contact the UJS portal.
+
+    The index only holds names that this process has seen (or loaded with
+    `default_index.load`), so each worker process may give different answers.
+
+    Args:
+        first_name (str): First name of person to search
+        last_name (str): Last name
+        dob (date): Birth date, optional
+        limit (int): the most candidates to return.
+
+    Returns:
+        a list of candidate dockets, best matches first.
+    """
+    return default_index.search(first_name, last_name, dob, limit=limit)
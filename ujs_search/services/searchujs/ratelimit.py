@@ -0,0 +1,289 @@
+"""
+A rate limit and concurrency budget for the UJS portal that is shared by every
+process on a host.
+
+Each web worker and batch script would otherwise limit itself independently, so
+the total load on the portal would grow with the number of processes. Instead,
+every UJSSearch draws from one token bucket and one pool of concurrency leases,
+kept in a store that all the processes can see.
+
+Configure the shared limit in django settings:
+
+    UJS_SEARCH_SHARED_LIMIT = {
+        "BACKEND": "file",  # or "cache", or "local" for a single process.
+        "PATH": "/var/lib/ujs_search/limit.json",  # required for the file backend.
+        "CACHE": "default",  # the django cache alias for the cache backend.
+        "RATE": 5,  # requests per second.
+        "BURST": 10,
+        "MAX_CONCURRENT": 8,
+    }
+
+The file backend's file is created readable and writable by its group, so keep
+it in a directory that every user running a search can write to, and that only
+they can.
+
+The cache backend works with any django cache that is shared between processes,
+including the DatabaseCache, which keeps the budget in the django database.
+"""
+
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from functools import partial
+from typing import Callable, Dict, Optional, Tuple, Union
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# A function of the current state in a store (or None), returning the new state
+# and a result to pass back to the caller.
+Change = Callable[[Optional[Dict]], Tuple[Dict, float]]
+
+
+class LocalStore:
+    """
+    Keep the rate limit state in this process's memory.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.state: Dict[str, Dict] = {}
+
+    def update(self, key: str, change: Change) -> float:
+        """
+        Atomically replace the state at `key` with the state `change` returns,
+        and return `change`'s result.
+        """
+        with self.lock:
+            state, result = change(self.state.get(key))
+            self.state[key] = state
+            return result
+
+
+class FileStore:
+    """
+    Keep the rate limit state in a json file, locked while it is updated. Every
+    process on the host that uses the same file shares the same budget, including
+    processes running as other users in the file's group.
+    """
+
+    mode = 0o660
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def open(self) -> int:
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_EXCL, self.mode)
+        except FileExistsError:
+            return os.open(self.path, os.O_RDWR)
+        # The umask would otherwise take away the group's permission to write.
+        os.fchmod(fd, self.mode)
+        return fd
+
+    def update(self, key: str, change: Change) -> float:
+        import fcntl
+
+        with os.fdopen(self.open(), "r+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                contents = f.read()
+                data = json.loads(contents) if contents else {}
+                data[key], result = change(data.get(key))
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(data))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return result
+
+
+class CacheStore:
+    """
+    Keep the rate limit state in a django cache. Updates are guarded by a lock
+    key, taken with the cache's atomic `add`.
+    """
+
+    def __init__(self, alias: str = "default", lock_timeout: float = 5):
+        from django.core.cache import caches
+
+        self.cache = caches[alias]
+        self.lock_timeout = lock_timeout
+
+    def update(self, key: str, change: Change) -> float:
+        lock_key = f"{key}:lock"
+        # If whoever holds the lock died, the lock's timeout frees it, so waiting
+        # for longer than that means something else is wrong.
+        deadline = time.monotonic() + 2 * self.lock_timeout
+        while not self.cache.add(lock_key, 1, timeout=self.lock_timeout):
+            if time.monotonic() > deadline:
+                raise TimeoutError("Waited too long for the shared rate limit lock.")
+            time.sleep(0.005)
+        try:
+            state, result = change(self.cache.get(key))
+            self.cache.set(key, state, timeout=None)
+        finally:
+            self.cache.delete(lock_key)
+        return result
+
+
+class SharedRateLimiter:
+    """
+    A token bucket and a pool of concurrency leases, kept in a shared store.
+
+    Args:
+        store: a LocalStore, FileStore or CacheStore.
+        rate: requests per second allowed, across every process using the store.
+        burst: the most requests that can be sent at once after a quiet period.
+        max_concurrent: the most requests that can be in flight at once.
+        lease_timeout: seconds after which a lease that was never released (for
+            example because its process died) is given back.
+        key: the key the state is kept under in the store.
+    """
+
+    poll_interval = 0.05
+
+    def __init__(
+        self,
+        store,
+        rate: float = 5,
+        burst: int = 10,
+        max_concurrent: int = 8,
+        lease_timeout: float = 120,
+        key: str = "ujs_search:portal",
+    ):
+        self.store = store
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+        self.lease_timeout = lease_timeout
+        self.key = key
+
+    def take(self, lease: str, state: Optional[Dict]) -> Tuple[Dict, float]:
+        """
+        Try to take a token and a lease. Returns the new state and how long to
+        wait before trying again, which is 0 if the lease was taken.
+        """
+        now = time.time()
+        state = state or {"tokens": self.burst, "updated": now, "leases": {}}
+        leases = {k: v for k, v in state["leases"].items() if v > now}
+        tokens = min(self.burst, state["tokens"] + (now - state["updated"]) * self.rate)
+        if len(leases) >= self.max_concurrent:
+            wait = self.poll_interval
+        elif tokens < 1:
+            wait = (1 - tokens) / self.rate
+        else:
+            tokens -= 1
+            leases[lease] = now + self.lease_timeout
+            wait = 0
+        return {"tokens": tokens, "updated": now, "leases": leases}, wait
+
+    def give_back(self, lease: str, state: Optional[Dict]) -> Tuple[Dict, float]:
+        """
+        Return a lease taken with `take`.
+        """
+        if state is None:
+            state = {"tokens": self.burst, "updated": time.time(), "leases": {}}
+        state["leases"].pop(lease, None)
+        return state, 0
+
+    async def acquire(self) -> str:
+        """
+        Wait for the shared budget to allow another request.
+
+        Returns:
+            a lease, to pass to `release` when the request is finished.
+        """
+        lease = uuid.uuid4().hex
+        while True:
+            update = asyncio.ensure_future(
+                asyncio.to_thread(
+                    self.store.update, self.key, partial(self.take, lease)
+                )
+            )
+            try:
+                wait = await asyncio.shield(update)
+            except asyncio.CancelledError:
+                # The store is still updated in its thread, so the lease may be
+                # taken after all. Give it back, or it is held until it expires.
+                await asyncio.shield(self.abandon(update, lease))
+                raise
+            if wait == 0:
+                return lease
+            await asyncio.sleep(wait)
+
+    async def abandon(self, update: asyncio.Future, lease: str) -> None:
+        """
+        Give back a lease once the update that may have taken it is finished.
+        """
+        try:
+            wait = await update
+        except Exception:
+            return
+        if wait == 0:
+            await self.release(lease)
+
+    async def release(self, lease: str) -> None:
+        await asyncio.to_thread(
+            self.store.update, self.key, partial(self.give_back, lease)
+        )
+
+
+shared_limiter: Optional[SharedRateLimiter] = None
+shared_limiter_configured = False
+
+
+def configure_shared_limiter(limiter: Optional[SharedRateLimiter]) -> None:
+    """
+    Set the shared limiter used by every UJSSearch, for scripts that do not use
+    django settings. Pass None to turn the shared limit off.
+    """
+    global shared_limiter, shared_limiter_configured
+    shared_limiter = limiter
+    shared_limiter_configured = True
+
+
+def get_shared_limiter() -> Optional[SharedRateLimiter]:
+    """
+    The shared limiter configured in UJS_SEARCH_SHARED_LIMIT, or None if there
+    is no shared limit.
+    """
+    if shared_limiter_configured:
+        return shared_limiter
+    config = (
+        getattr(settings, "UJS_SEARCH_SHARED_LIMIT", None)
+        if settings.configured
+        else None
+    )
+    if not config:
+        configure_shared_limiter(None)
+        return None
+    backend = config.get("BACKEND", "file")
+    store: Union[FileStore, CacheStore, LocalStore]
+    if backend == "file":
+        if not config.get("PATH"):
+            raise ValueError(
+                "UJS_SEARCH_SHARED_LIMIT needs a PATH for the file backend"
+            )
+        store = FileStore(config["PATH"])
+    elif backend == "cache":
+        store = CacheStore(config.get("CACHE", "default"))
+    elif backend == "local":
+        store = LocalStore()
+    else:
+        raise ValueError(f"Unknown UJS_SEARCH_SHARED_LIMIT backend {backend}")
+    configure_shared_limiter(
+        SharedRateLimiter(
+            store,
+            rate=config.get("RATE", 5),
+            burst=config.get("BURST", 10),
+            max_concurrent=config.get("MAX_CONCURRENT", 8),
+        )
+    )
+    return shared_limiter
@@ -0,0 +1,68 @@
+"""
+Run background work for the portal on one long-lived event loop.
+
+Warming up prefetches verification tokens on this loop, in a background thread,
+so that starting a process doesn't wait on the portal. Searches don't run here:
+each search runs in its own event loop in the thread that asked for it, so that
+the searches of a threaded server don't queue up behind one thread.
+"""
+
+from __future__ import annotations
+import asyncio
+import threading
+import concurrent.futures
+from typing import Any, Callable, Coroutine, Optional, Tuple, TypeVar
+import aiohttp
+
+T = TypeVar("T")
+
+# A function of the runner's connector, returning the coroutine to run.
+Task = Callable[[aiohttp.BaseConnector], Coroutine[Any, Any, T]]
+
+
+class PortalRunner:
+    """
+    An event loop in a background thread, with a connection pool for the portal.
+    """
+
+    def __init__(self) -> None:
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.connector: Optional[aiohttp.TCPConnector] = None
+        self.lock = threading.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self.loop is not None
+
+    def start(self) -> Tuple[asyncio.AbstractEventLoop, aiohttp.TCPConnector]:
+        """
+        Start the event loop, if it hasn't been started yet.
+
+        Returns:
+            the loop and its connector.
+        """
+        with self.lock:
+            if self.loop is None or self.connector is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="ujs-search-portal", daemon=True
+                ).start()
+                self.connector = asyncio.run_coroutine_threadsafe(
+                    self.make_connector(), loop
+                ).result()
+                self.loop = loop
+            return self.loop, self.connector
+
+    async def make_connector(self) -> aiohttp.TCPConnector:
+        return aiohttp.TCPConnector(keepalive_timeout=60, ttl_dns_cache=600)
+
+    def submit(self, task: Task[T]) -> concurrent.futures.Future[T]:
+        """
+        Schedule a task on the runner's loop without waiting for it, starting the
+        runner if needed.
+        """
+        loop, connector = self.start()
+        return asyncio.run_coroutine_threadsafe(task(connector), loop)
+
+
+portal_runner = PortalRunner()
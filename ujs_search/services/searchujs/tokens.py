@@ -0,0 +1,48 @@
+"""
+A pool of request verification tokens fetched ahead of time.
+
+A verification token only works with the cookies the portal set when it handed
+out the token, so each token is kept together with its cookies.
+"""
+
+import threading
+import time
+from collections import deque
+from http.cookies import BaseCookie
+from typing import Deque, Optional, Tuple
+
+
+class TokenPool:
+    """
+    Tokens prefetched from the portal, each usable for one search.
+
+    Args:
+        max_age: seconds after which a prefetched token is too old to use.
+    """
+
+    def __init__(self, max_age: float = 300):
+        self.max_age = max_age
+        self.tokens: Deque[Tuple[float, str, BaseCookie]] = deque()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def put(self, token: str, cookies: BaseCookie) -> None:
+        with self.lock:
+            self.tokens.append((time.monotonic(), token, cookies))
+
+    def take(self) -> Optional[Tuple[str, BaseCookie]]:
+        """
+        Take a token and its cookies out of the pool, or None if there are no
+        fresh tokens left.
+        """
+        with self.lock:
+            while self.tokens:
+                fetched, token, cookies = self.tokens.popleft()
+                if time.monotonic() - fetched < self.max_age:
+                    return token, cookies
+        return None
+
+
+prefetched_tokens = TokenPool()
@@ -0,0 +1,145 @@
+"""
+Transports that carry requests from a UJSSearch to the UJS portal.
+
+The default transport sends requests through the aiohttp session. The recording
+and replaying transports let us capture real portal traffic to an archive on disk
+and play it back later without a network.
+"""
+
+from __future__ import annotations
+import asyncio
+import gzip
+import json
+import logging
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Fields that change from one visit to the portal to the next, and so
+# should not be used to match a replayed request to a recorded one.
+VOLATILE_FIELDS = ("__RequestVerificationToken", "FiledEndDate")
+
+
+def request_key(method: str, url: str, data: Optional[Dict] = None) -> str:
+    """
+    Build the key used to match a request against an archive of recorded requests.
+    """
+    stable = {k: v for k, v in (data or {}).items() if k not in VOLATILE_FIELDS}
+    return json.dumps([method.upper(), url, stable], sort_keys=True)
+
+
+class SessionTransport:
+    """
+    Send requests to the portal through an aiohttp session.
+    """
+
+    async def request(
+        self,
+        session,
+        method: str,
+        url: str,
+        data: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+    ) -> Tuple[int, str]:
+        """
+        Send a request and return the response's status and text.
+
+        The text is always read, even for failed requests. Reading the text seems
+        to be neccessary to avoid ssl connections closing too soon.
+        """
+        async with session.request(method, url, data=data, headers=headers) as response:
+            # use response.request_info to see what was actually requested.
+            return response.status, await response.text()
+
+
+class RecordingTransport:
+    """
+    Send requests through another transport and record each request and
+    response to a gzipped archive of json lines.
+
+    Use as a context manager, or call `close` when finished, so the archive is
+    flushed to disk.
+    """
+
+    def __init__(self, path: str, inner: Optional[SessionTransport] = None):
+        self.path = path
+        self.inner = inner or SessionTransport()
+        self.archive = gzip.open(path, "at", encoding="utf-8")
+
+    async def request(
+        self,
+        session,
+        method: str,
+        url: str,
+        data: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+    ) -> Tuple[int, str]:
+        sent = time.monotonic()
+        status, text = await self.inner.request(
+            session, method, url, data=data, headers=headers
+        )
+        entry = {
+            "key": request_key(method, url, data),
+            "elapsed": round(time.monotonic() - sent, 4),
+            "status": status,
+            "text": text,
+        }
+        self.archive.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        return status, text
+
+    def close(self):
+        self.archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ReplayTransport:
+    """
+    Answer requests from an archive written by a RecordingTransport.
+
+    Recorded responses to the same request are replayed in the order they were
+    recorded. Once they run out, the last one is repeated. Requests that were never
+    recorded get a 404.
+
+    Args:
+        path: the archive to replay.
+        realtime: if True, wait as long as the portal took to answer each
+            recorded request. Otherwise answer as fast as possible.
+    """
+
+    def __init__(self, path: str, realtime: bool = False):
+        self.path = path
+        self.realtime = realtime
+        self.responses: Dict[str, Deque[Dict]] = defaultdict(deque)
+        with gzip.open(path, "rt", encoding="utf-8") as archive:
+            for line in archive:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.responses[entry["key"]].append(entry)
+
+    async def request(
+        self,
+        session,
+        method: str,
+        url: str,
+        data: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+    ) -> Tuple[int, str]:
+        recorded = self.responses.get(request_key(method, url, data))
+        if not recorded:
+            logger.warning("No recorded response for %s %s", method, url)
+            return 404, ""
+        entry = recorded.popleft() if len(recorded) > 1 else recorded[0]
+        if self.realtime:
+            await asyncio.sleep(entry["elapsed"])
+        return entry["status"], entry["text"]
+
+
+default_transport = SessionTransport()
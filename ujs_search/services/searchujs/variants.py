@@ -0,0 +1,232 @@
+"""
+Search for a person under the variants of their name.
+
+People show up on the portal under hyphenated surnames, maiden names, nicknames
+and with or without middle initials. Rather than running each variant by hand,
+generate the variants, search them all at once, and merge the results.
+
+Add nicknames to the built in list in django settings, as groups of names that
+are interchangeable:
+
+    UJS_SEARCH_NICKNAMES = [["Robert", "Bob", "Bobby", "Rob"]]
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+from dataclasses import asdict
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+import aiohttp
+from django.conf import settings
+from .by_name import search_by_names_task, person_key
+
+logger = logging.getLogger(__name__)
+
+NICKNAMES = [
+    ["William", "Bill", "Billy", "Will", "Willie"],
+    ["Robert", "Bob", "Bobby", "Rob"],
+    ["Richard", "Rick", "Dick", "Rich"],
+    ["James", "Jim", "Jimmy", "Jamie"],
+    ["John", "Jack", "Johnny"],
+    ["Joseph", "Joe", "Joey"],
+    ["Michael", "Mike", "Mikey"],
+    ["Thomas", "Tom", "Tommy"],
+    ["Charles", "Charlie", "Chuck"],
+    ["Anthony", "Tony"],
+    ["Christopher", "Chris"],
+    ["Daniel", "Dan", "Danny"],
+    ["David", "Dave"],
+    ["Edward", "Ed", "Eddie"],
+    ["Elizabeth", "Liz", "Beth", "Betty"],
+    ["Jennifer", "Jen", "Jenny"],
+    ["Katherine", "Kathy", "Kate", "Katie"],
+    ["Margaret", "Maggie", "Peggy"],
+    ["Patricia", "Pat", "Patty", "Trish"],
+    ["Rebecca", "Becky"],
+    ["Samuel", "Sam"],
+    ["Steven", "Steve"],
+    ["Susan", "Sue", "Suzy"],
+]
+
+RULES = ("aliases", "middle_initial", "hyphenated", "nicknames")
+# Nicknames multiply the variants of every other rule, so they are only swapped
+# in when asked for.
+DEFAULT_RULES = ("aliases", "middle_initial", "hyphenated")
+
+# Searching for too many variants at once is unkind to the portal. Each variant
+# takes two requests.
+MAX_VARIANTS = 10
+
+
+def nickname_groups() -> List[List[str]]:
+    extra = getattr(settings, "UJS_SEARCH_NICKNAMES", []) if settings.configured else []
+    return NICKNAMES + list(extra)
+
+
+def nicknames_for(first_name: str) -> List[str]:
+    """
+    Names that are interchangeable with a first name, not including the name itself.
+    """
+    lowered = first_name.lower()
+    names: List[str] = []
+    for group in nickname_groups():
+        if lowered in (name.lower() for name in group):
+            names.extend(name for name in group if name.lower() != lowered)
+    return names
+
+
+def drop_middle_initial(first_name: str, last_name: str) -> List[Tuple[str, str]]:
+    """
+    'John Q.' becomes 'John'.
+    """
+    parts = first_name.split()
+    if len(parts) > 1:
+        return [(parts[0], last_name)]
+    return []
+
+
+def split_hyphenated(first_name: str, last_name: str) -> List[Tuple[str, str]]:
+    """
+    'Smith-Jones' becomes 'Smith', 'Jones' and 'Smith Jones'.
+    """
+    parts = [part.strip() for part in last_name.split("-") if part.strip()]
+    if len(parts) > 1:
+        return [(first_name, part) for part in parts] + [(first_name, " ".join(parts))]
+    return []
+
+
+def swap_nicknames(first_name: str, last_name: str) -> List[Tuple[str, str]]:
+    return [(nickname, last_name) for nickname in nicknames_for(first_name)]
+
+
+EXPANSIONS = {
+    "middle_initial": drop_middle_initial,
+    "hyphenated": split_hyphenated,
+    "nicknames": swap_nicknames,
+}
+
+
+def generate_variants(
+    first_name: str,
+    last_name: str,
+    aliases: Optional[Sequence[Dict]] = None,
+    rules: Sequence[str] = DEFAULT_RULES,
+) -> List[Tuple[str, str]]:
+    """
+    Generate the variants of a name to search for, starting with the name itself.
+
+    Args:
+        first_name (str): First name of person to search
+        last_name (str): Last name
+        aliases: other names the person is known by, like a maiden name, as dicts
+            with a last_name and optionally a first_name.
+        rules: which of the RULES to apply. Nicknames are left out by default.
+
+    Returns:
+        a list of (first name, last name) pairs, at most MAX_VARIANTS long.
+    """
+    unknown = set(rules) - set(RULES)
+    if unknown:
+        raise ValueError(f"Unknown name variant rules: {', '.join(sorted(unknown))}")
+    variants = [(first_name.strip(), last_name.strip())]
+    if "aliases" in rules:
+        for alias in aliases or []:
+            variants.append(
+                (
+                    (alias.get("first_name") or first_name).strip(),
+                    alias["last_name"].strip(),
+                )
+            )
+    for rule in RULES[1:]:
+        if rule in rules:
+            for first, last in list(variants):
+                variants.extend(EXPANSIONS[rule](first, last))
+
+    unique = []
+    seen = set()
+    for first, last in variants:
+        if (first.lower(), last.lower()) not in seen:
+            seen.add((first.lower(), last.lower()))
+            unique.append((first, last))
+    if len(unique) > MAX_VARIANTS:
+        logger.info("only searching the first %d name variants", MAX_VARIANTS)
+    return unique[:MAX_VARIANTS]
+
+
+async def search_by_name_variants_task(
+    first_name: str,
+    last_name: str,
+    dob: Optional[date] = None,
+    aliases: Optional[Sequence[Dict]] = None,
+    rules: Sequence[str] = DEFAULT_RULES,
+    transport=None,
+    connector: Optional[aiohttp.BaseConnector] = None,
+) -> Tuple[List[Dict], List[str]]:
+    """
+    Async task to search the UJS CaseSearch site for every variant of a name at
+    once, and merge the results.
+
+    Returns:
+        A list of search results as dicts, with the variants that found each one
+        in "matched_variants"
+        A list of error messages.
+    """
+    variants = generate_variants(first_name, last_name, aliases, rules)
+    people = [
+        {"first_name": first, "last_name": last, "dob": dob} for first, last in variants
+    ]
+    found = await search_by_names_task(people, transport=transport, connector=connector)
+
+    merged: Dict[str, Dict] = {}
+    errs: List[str] = []
+    for first, last in variants:
+        label = f"{last}, {first}"
+        results, variant_errs = found[person_key(first, last, dob)]
+        errs.extend(f"{label}: {err}" for err in variant_errs)
+        for result in results:
+            row = merged.setdefault(
+                result.docket_number, {**asdict(result), "matched_variants": []}
+            )
+            # A docket with several participants can be listed once for each.
+            if label not in row["matched_variants"]:
+                row["matched_variants"].append(label)
+    return list(merged.values()), errs
+
+
+def search_by_name_variants(
+    first_name: str,
+    last_name: str,
+    dob: Optional[date] = None,
+    aliases: Optional[Sequence[Dict]] = None,
+    rules: Sequence[str] = DEFAULT_RULES,
+    transport=None,
+) -> Tuple[List[Dict], List[str]]:
+    """
+    Search the UJS CaseSearch site for public records relating to a person, under
+    every variant of their name.
+
+    Args:
+        first_name (str): First name of person to search
+        last_name (str): Last name
+        dob (date): Birth date, optional
+        aliases: other names the person is known by, like a maiden name, as dicts
+            with a last_name and optionally a first_name.
+        rules: which of the RULES to use to generate variants. Nicknames are left
+            out by default.
+        transport: optional transport for recording or replaying requests.
+
+    Returns:
+        the results as a list of dicts, merged by docket number. Each includes
+        the "matched_variants" that found it, like "Rabbit, Bunny".
+    """
+    return asyncio.run(
+        search_by_name_variants_task(
+            first_name,
+            last_name,
+            dob,
+            aliases=aliases,
+            rules=rules,
+            transport=transport,
+        )
+    )
@@ -0,0 +1,100 @@
+"""
+Warm up a process before its first search.
+
+The first search in a fresh process otherwise pays for fetching a verification
+token before it can search. Warming up fetches tokens ahead of time, along with
+the cookies that go with them, and loads the county lookup table into memory.
+
+Tokens are fetched on the portal runner's loop, in a background thread. Under
+gunicorn, warm up in each worker (not in the master with --preload), since the
+runner's thread does not survive a fork.
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+from typing import List, Optional
+import aiohttp
+from yarl import URL
+from .UJSSearch import UJSSearch, SITE_ROOT
+from .counties import load_county_lookup
+from .runner import portal_runner
+from .tokens import prefetched_tokens
+
+logger = logging.getLogger(__name__)
+
+
+async def prefetch_token_task(
+    connector: Optional[aiohttp.BaseConnector] = None,
+) -> List[str]:
+    """
+    Fetch a verification token, and keep it with its cookies for a later search.
+    """
+    async with aiohttp.ClientSession(
+        headers=UJSSearch.__headers__,
+        connector=connector,
+        connector_owner=connector is None,
+    ) as session:
+        searcher = UJSSearch(session=session)
+        main_page, errs = await searcher.fetch(f"{SITE_ROOT}/CaseSearch")
+        token = searcher.get_request_verification_token(main_page)
+        if token:
+            prefetched_tokens.put(
+                token, session.cookie_jar.filter_cookies(URL(SITE_ROOT))
+            )
+        elif not errs:
+            errs.append("Could not find a verification token on the search page")
+        return errs
+
+
+async def warm_up_task(
+    connector: Optional[aiohttp.BaseConnector], connections: int = 2
+) -> List[str]:
+    """
+    Prefetch `connections` tokens at once, each over its own connection.
+
+    Returns:
+        a list of error messages.
+    """
+    results = await asyncio.gather(
+        *[prefetch_token_task(connector) for _ in range(connections)],
+        return_exceptions=True,
+    )
+    errs = []
+    for result in results:
+        if isinstance(result, BaseException):
+            errs.append(str(result))
+        else:
+            errs.extend(result)
+    return errs
+
+
+def warm_up(wait: bool = True, connections: int = 2) -> List[str]:
+    """
+    Warm up this process for searching the portal.
+
+    Args:
+        wait: if False, load the lookup tables and start fetching tokens, but
+            return without waiting for the tokens.
+        connections: how many connections to open and tokens to prefetch.
+
+    Returns:
+        a list of error messages, if we waited for them.
+    """
+    load_county_lookup()
+    future = portal_runner.submit(
+        lambda connector: warm_up_task(connector, connections)
+    )
+    if not wait:
+        future.add_done_callback(log_warm_up_errors)
+        return []
+    return future.result()
+
+
+def log_warm_up_errors(future) -> None:
+    try:
+        errs = future.result()
+    except Exception as ex:
+        errs = [str(ex)]
+    for err in errs:
+        logger.warning("Warming up for UJS searches: %s", err)
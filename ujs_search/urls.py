@@ -3,6 +3,7 @@ from .views import *
 
 urlpatterns = [
     path("search/name/", SearchName.as_view()),
+    path("search/name/many/", SearchMultipleNames.as_view()),
     path("search/docket/", SearchDocket.as_view()),
     path("search/docket/many/", SearchMultipleDockets.as_view()),
 ]
\ No newline at end of file
@@ -6,7 +6,8 @@ from rest_framework import status
 import logging
 from . import appsettings
 from .serializers import (
-    NameSearchSerializer,
+    NameVariantSearchSerializer,
+    MultipleNameSearchSerializer,
     DocketSearchSerializer,
     MultipleDocketSearchSerializer,
 )
@@ -14,20 +15,35 @@ from .services import searchujs
 
 logger = logging.getLogger(__name__)
 
+
+def search_name(search_data):
+    """
+    Search for a name, and also its variants if the search asks to expand them.
+    """
+    expand_variants = search_data.pop("expand_variants")
+    aliases = search_data.pop("aliases")
+    rules = search_data.pop("rules")
+    if expand_variants:
+        return searchujs.search_by_name_variants(
+            **search_data, aliases=aliases, rules=rules
+        )
+    return searchujs.search_by_name(**search_data)
+
+
 # class SearchName(APIView):
 class SearchName(generics.CreateAPIView):
 
     queryset = []
-    serializer_class = NameSearchSerializer
+    serializer_class = NameVariantSearchSerializer
     permission_classes = appsettings.PERMISSION_CLASSES
 
     def get(self, request, *args, **kwargs):
         try:
-            to_search = NameSearchSerializer(data=request.query_params)
+            to_search = NameVariantSearchSerializer(data=request.query_params)
             if to_search.is_valid():
                 # search ujs portal for a name.
                 # and return the results.
-                results, errs = searchujs.search_by_name(**to_search.validated_data)
+                results, errs = search_name(to_search.validated_data)
                 return Response({"searchResults": results, "errors": errs})
             else:
                 return Response(
@@ -38,11 +54,11 @@ class SearchName(generics.CreateAPIView):
 
     def post(self, request, *args, **kwargs):
         try:
-            to_search = NameSearchSerializer(data=request.data)
+            to_search = NameVariantSearchSerializer(data=request.data)
             if to_search.is_valid():
                 # search ujs portal for a name.
                 # and return the results.
-                results, errs = searchujs.search_by_name(**to_search.validated_data)
+                results, errs = search_name(to_search.validated_data)
                 return Response({"searchResults": results, "errors": errs})
             else:
                 return Response(
@@ -52,6 +68,30 @@ class SearchName(generics.CreateAPIView):
             return Response({"errors": [str(ex)]})
 
 
+class SearchMultipleNames(generics.CreateAPIView):
+
+    queryset = []
+    serializer_class = MultipleNameSearchSerializer
+    permission_classes = appsettings.PERMISSION_CLASSES
+
+    def post(self, request, *args, **kwargs):
+        try:
+            search_data = MultipleNameSearchSerializer(data=request.data)
+            if search_data.is_valid():
+                # search for everyone at once. Each person's errors are
+                # returned with their results.
+                results = searchujs.search_by_names(
+                    search_data.validated_data["people"]
+                )
+                return Response({"searchResults": results, "errors": []})
+            else:
+                return Response(
+                    {"errors": search_data.errors}, status.HTTP_400_BAD_REQUEST
+                )
+        except Exception as ex:
+            return Response({"errors": [str(ex)]})
+
+
 class SearchDocket(generics.CreateAPIView):
 
     queryset = []